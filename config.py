@@ -5,10 +5,15 @@ Handles environment variables, validation, and default settings.
 """
 
 import os
-from typing import List, Dict, Any
+import re
+from typing import List, Dict, Any, FrozenSet
 from pathlib import Path
 
 
+# Splits comma-separated env values, absorbing surrounding whitespace
+_WORD_LIST_SPLIT = re.compile(r'\s*,\s*')
+
+
 class InterruptHandlerConfig:
     """
     Configuration manager for InterruptHandler.
@@ -17,25 +22,33 @@ class InterruptHandlerConfig:
     """
     
     # Default filler words (can be extended)
-    DEFAULT_IGNORED_WORDS = [
+    DEFAULT_IGNORED_WORDS: FrozenSet[str] = frozenset([
         'uh', 'um', 'umm', 'hmm', 'hm', 'haan', 'huh',
         'eh', 'ah', 'er', 'mm', 'mhm', 'uh-huh', 'mm-hmm'
-    ]
+    ])
     
     # Default command words (always trigger interrupt)
-    DEFAULT_COMMAND_WORDS = [
+    DEFAULT_COMMAND_WORDS: FrozenSet[str] = frozenset([
         'wait', 'stop', 'hold', 'pause', 'no', 'listen',
         'excuse me', 'hang on', 'one second', 'actually'
-    ]
+    ])
     
     # Default thresholds
     DEFAULT_CONFIDENCE_THRESHOLD = 0.3
     DEFAULT_LOW_CONFIDENCE_TIME_MS = 500
+    DEFAULT_BATCH_WINDOW_MS = 0
     
     def __init__(self):
         """Initialize config from environment variables"""
         self.config = self._load_config()
     
+    @staticmethod
+    def _parse_word_list(value: str) -> FrozenSet[str]:
+        """Parse a comma-separated word list into a lowercased frozenset"""
+        return frozenset(
+            w.lower() for w in _WORD_LIST_SPLIT.split(value.strip()) if w
+        )
+    
     def _load_config(self) -> Dict[str, Any]:
         """
         Load configuration from environment variables.
@@ -43,33 +56,35 @@ class InterruptHandlerConfig:
         Environment Variables:
             IGNORED_WORDS: Comma-separated list of filler words
             COMMAND_WORDS: Comma-separated list of command words
+                (both are lowercased and stored as frozensets)
             CONFIDENCE_THRESHOLD: Float between 0 and 1
             LOW_CONFIDENCE_TIME_MS: Integer milliseconds
+            BATCH_WINDOW_MS: Integer milliseconds to coalesce event bursts
+                (0 disables coalescing)
             LOG_FILE: Path to JSONL log file
             ENABLE_LOGGING: 'true' or 'false'
+            LOG_IGNORED: 'true' to also log ignored events (default 'false')
+            LOG_TOKENS_ON_IGNORE: 'true' to keep tokens in logged ignored
+                events (default 'false')
         
         Returns:
             Dict with validated configuration
         """
-        config = {}
+        config: Dict[str, Any] = {}
         
         # Load ignored words
         ignored_words_env = os.getenv('IGNORED_WORDS', '').strip()
         if ignored_words_env:
-            config['ignored_words'] = [
-                w.strip() for w in ignored_words_env.split(',') if w.strip()
-            ]
+            config['ignored_words'] = self._parse_word_list(ignored_words_env)
         else:
-            config['ignored_words'] = self.DEFAULT_IGNORED_WORDS.copy()
+            config['ignored_words'] = self.DEFAULT_IGNORED_WORDS
         
         # Load command words
         command_words_env = os.getenv('COMMAND_WORDS', '').strip()
         if command_words_env:
-            config['command_words'] = [
-                w.strip() for w in command_words_env.split(',') if w.strip()
-            ]
+            config['command_words'] = self._parse_word_list(command_words_env)
         else:
-            config['command_words'] = self.DEFAULT_COMMAND_WORDS.copy()
+            config['command_words'] = self.DEFAULT_COMMAND_WORDS
         
         # Load confidence threshold
         confidence_env = os.getenv('CONFIDENCE_THRESHOLD', '').strip()
@@ -99,6 +114,22 @@ class InterruptHandlerConfig:
         else:
             config['low_confidence_time_ms'] = self.DEFAULT_LOW_CONFIDENCE_TIME_MS
         
+        # Load batch window
+        batch_window_env = os.getenv('BATCH_WINDOW_MS', '').strip()
+        if batch_window_env:
+            try:
+                batch_window = int(batch_window_env)
+                if batch_window >= 0:
+                    config['batch_window_ms'] = batch_window
+                else:
+                    raise ValueError("Must be non-negative")
+            except ValueError as e:
+                print(f"Warning: Invalid BATCH_WINDOW_MS '{batch_window_env}': {e}")
+                print(f"Using default: {self.DEFAULT_BATCH_WINDOW_MS}")
+                config['batch_window_ms'] = self.DEFAULT_BATCH_WINDOW_MS
+        else:
+            config['batch_window_ms'] = self.DEFAULT_BATCH_WINDOW_MS
+        
         # Load log file path
         log_file_env = os.getenv('LOG_FILE', '').strip()
         if log_file_env:
@@ -110,6 +141,14 @@ class InterruptHandlerConfig:
         enable_logging_env = os.getenv('ENABLE_LOGGING', 'true').strip().lower()
         config['enable_logging'] = enable_logging_env in ('true', '1', 'yes', 'on')
         
+        # Load ignored-event logging flag
+        log_ignored_env = os.getenv('LOG_IGNORED', 'false').strip().lower()
+        config['log_ignored'] = log_ignored_env in ('true', '1', 'yes', 'on')
+        
+        # Load ignored-event token logging flag
+        log_tokens_env = os.getenv('LOG_TOKENS_ON_IGNORE', 'false').strip().lower()
+        config['log_tokens_on_ignore'] = log_tokens_env in ('true', '1', 'yes', 'on')
+        
         return config
     
     def get_config(self) -> Dict[str, Any]:
@@ -121,16 +160,21 @@ class InterruptHandlerConfig:
         print("=" * 60)
         print("InterruptHandler Configuration")
         print("=" * 60)
-        print(f"Ignored Words ({len(self.config['ignored_words'])}): "
-              f"{', '.join(self.config['ignored_words'][:10])}"
-              f"{'...' if len(self.config['ignored_words']) > 10 else ''}")
-        print(f"Command Words ({len(self.config['command_words'])}): "
-              f"{', '.join(self.config['command_words'][:5])}"
-              f"{'...' if len(self.config['command_words']) > 5 else ''}")
+        ignored_words = sorted(self.config['ignored_words'])
+        command_words = sorted(self.config['command_words'])
+        print(f"Ignored Words ({len(ignored_words)}): "
+              f"{', '.join(ignored_words[:10])}"
+              f"{'...' if len(ignored_words) > 10 else ''}")
+        print(f"Command Words ({len(command_words)}): "
+              f"{', '.join(command_words[:5])}"
+              f"{'...' if len(command_words) > 5 else ''}")
         print(f"Confidence Threshold: {self.config['confidence_threshold']}")
         print(f"Low Confidence Time: {self.config['low_confidence_time_ms']}ms")
+        print(f"Batch Window: {self.config['batch_window_ms']}ms")
         print(f"Log File: {self.config['log_file']}")
         print(f"Logging Enabled: {self.config['enable_logging']}")
+        print(f"Log Ignored Events: {self.config['log_ignored']}")
+        print(f"Log Tokens On Ignore: {self.config['log_tokens_on_ignore']}")
         print("=" * 60)
 
 
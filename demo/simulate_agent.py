@@ -2,6 +2,7 @@
 Demo simulation of LiveKit agent with InterruptHandler.
 
 Simulates a conversation with various scenarios to demonstrate the handler's behavior.
+When uvloop is installed, the demo runs on its libuv-backed event loop.
 """
 
 import asyncio
@@ -10,6 +11,11 @@ from pathlib import Path
 from datetime import datetime
 import logging
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None  # type: ignore[assignment]
+
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -35,16 +41,17 @@ class SimulatedAgent:
     def __init__(self):
         self.is_speaking = False
         self.interrupted_count = 0
-        self.speech_segments = []
+        # Speech segments, one parallel list per field
+        self.segment_texts = []
+        self.segment_started = []
+        self.segment_completed = []
     
     async def start_speaking(self, text: str):
         """Simulate agent starting to speak"""
         self.is_speaking = True
-        self.speech_segments.append({
-            'text': text,
-            'started_at': datetime.now(),
-            'completed': False
-        })
+        self.segment_texts.append(text)
+        self.segment_started.append(datetime.now())
+        self.segment_completed.append(False)
         print(f"\n🤖 Agent: {text}")
         print(f"   [Agent is now SPEAKING]")
     
@@ -53,16 +60,16 @@ class SimulatedAgent:
         if self.is_speaking:
             self.is_speaking = False
             self.interrupted_count += 1
-            if self.speech_segments:
-                self.speech_segments[-1]['completed'] = False
+            if self.segment_completed:
+                self.segment_completed[-1] = False
             print(f"   ❌ [Agent INTERRUPTED - stopping speech]")
     
     async def finish_speaking(self):
         """Simulate agent naturally finishing speech"""
         if self.is_speaking:
             self.is_speaking = False
-            if self.speech_segments:
-                self.speech_segments[-1]['completed'] = True
+            if self.segment_completed:
+                self.segment_completed[-1] = True
             print(f"   ✅ [Agent FINISHED speaking]")
 
 
@@ -74,6 +81,9 @@ class ConversationSimulator:
     def __init__(self):
         self.agent = SimulatedAgent()
         self.config = load_config()
+        # Log every decision, including ignored fillers, so the demo's
+        # log file shows the full conversation.
+        self.config['log_ignored'] = True
         self.handler = InterruptHandler(self.agent, self.config)
         
         # Statistics
@@ -259,8 +269,8 @@ class ConversationSimulator:
         print(f"\nAgent was interrupted {self.agent.interrupted_count} times")
         
         # Speech completion stats
-        completed = sum(1 for s in self.agent.speech_segments if s.get('completed'))
-        interrupted = len(self.agent.speech_segments) - completed
+        completed = sum(self.agent.segment_completed)
+        interrupted = len(self.agent.segment_completed) - completed
         print(f"Agent completed {completed} speech segments")
         print(f"Agent was cut off in {interrupted} speech segments")
         
@@ -313,4 +323,7 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
@@ -9,49 +9,189 @@ License: MIT
 """
 
 import asyncio
+import itertools
 import json
 import logging
+import os
 import re
-import uuid
+import sys
+import time
+from collections import deque
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Callable
-from dataclasses import dataclass, asdict
-from threading import Lock
+from typing import (
+    Any, BinaryIO, Callable, Deque, Dict, FrozenSet, Iterable, List,
+    Optional, Tuple, Union
+)
+from dataclasses import dataclass, field
+from functools import lru_cache
 
+try:
+    import orjson
+except ImportError:  # Optional: faster JSONL serialization
+    orjson = None  # type: ignore[assignment]
 
-@dataclass
+try:
+    import ahocorasick  # type: ignore[import-not-found, unused-ignore]
+except ImportError:  # Optional: automaton for multi-word command phrases
+    ahocorasick = None  # type: ignore[assignment, unused-ignore]
+
+# Matches everything that is not a word character or whitespace
+_PUNCT_RE = re.compile(r'[^\w\s]')
+
+# Fast path equivalent to _PUNCT_RE for every ASCII character it removes
+# (punctuation and control characters; '_' is a word character) plus the
+# ellipsis, dashes and curly quotes ASR output commonly contains, so such
+# transcripts don't need the regex
+_PUNCT_TABLE = str.maketrans(
+    '', '',
+    ''.join(c for c in map(chr, range(128)) if _PUNCT_RE.match(c))
+    + '\u2026\u2014\u2013\u2018\u2019\u201c\u201d'
+)
+
+# (epoch second, its ISO 8601 'YYYY-MM-DDTHH:MM:SS' text) of the last
+# formatted timestamp; replaced as a whole, so concurrent writers are safe
+_iso_second_cache: Tuple[int, str] = (-1, '')
+
+
+def _format_timestamp_ns(timestamp_ns: int) -> str:
+    """
+    Format a time.time_ns() value like datetime.isoformat() in UTC.
+    
+    Log records written in the same second share the cached date/time
+    prefix; only the microseconds are formatted per record.
+    """
+    global _iso_second_cache
+    seconds, ns = divmod(timestamp_ns, 1_000_000_000)
+    cached_second, prefix = _iso_second_cache
+    if cached_second != seconds:
+        prefix = datetime.fromtimestamp(seconds, timezone.utc).strftime(
+            '%Y-%m-%dT%H:%M:%S'
+        )
+        _iso_second_cache = (seconds, prefix)
+    microsecond = ns // 1000
+    if microsecond:
+        return f"{prefix}.{microsecond:06d}+00:00"
+    return f"{prefix}+00:00"
+
+
+# Token classes produced by InterruptHandler._classify_transcript
+_EMPTY, _COMMAND, _FILLER_ONLY, _SPEECH = range(4)
+
+# Shared by every handler so ids stay unique within a process (next() on a
+# count is atomic under the GIL)
+_EVENT_COUNTER = itertools.count(1)
+
+# dataclass(slots=True) requires Python 3.10+; older versions keep __dict__
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class TranscriptionEvent:
-    """Represents a transcription event from ASR"""
+    """
+    Represents a transcription event from ASR.
+    
+    Events are immutable, so a single instance can be safely reused or
+    shared between concurrent handler calls.
+    
+    The private _lower field caches the lowercased transcript. It is not an
+    __init__ argument and is left out of repr and equality, but
+    dataclasses.fields() and asdict() still include it; drop the '_lower'
+    key when serializing events.
+    """
     transcript: str
     confidence: float
     is_final: bool = True
     timestamp: Optional[datetime] = None
+    # Lowercased transcript, computed once for the handler's matching
+    _lower: str = field(init=False, repr=False, compare=False)
     
     def __post_init__(self):
         if self.timestamp is None:
-            self.timestamp = datetime.now(timezone.utc)
+            object.__setattr__(self, 'timestamp', datetime.now(timezone.utc))
+        object.__setattr__(self, '_lower', self.transcript.lower())
+
 
+# Accepted by the event entry points: a TranscriptionEvent, a plain
+# (transcript, confidence[, is_final]) tuple that skips building one, or any
+# object with transcript and confidence attributes (e.g. a raw LiveKit event)
+_EventInput = Union[TranscriptionEvent, Tuple, Any]
 
-@dataclass
+
+def _as_transcription_event(event: _EventInput) -> TranscriptionEvent:
+    """Convert a tuple or duck-typed event into a TranscriptionEvent"""
+    if isinstance(event, TranscriptionEvent):
+        return event
+    if isinstance(event, tuple):
+        return TranscriptionEvent(*event)
+    return TranscriptionEvent(
+        event.transcript,
+        event.confidence,
+        getattr(event, 'is_final', True),
+        getattr(event, 'timestamp', None),
+    )
+
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class InterruptDecision:
-    """Represents a decision made about an interruption"""
+    """
+    Represents a decision made about an interruption.
+    
+    Decisions are built once with every field known and never modified.
+    """
     event_id: str
-    timestamp: datetime
+    timestamp_ns: int  # time.time_ns() when the decision started
     agent_speaking: bool
     transcript: str
-    tokens: List[str]
+    # Shared with the classification cache (immutable), written as a list
+    tokens: Tuple[str, ...]
     confidence: float
     action: str  # 'interrupt', 'ignore', 'register'
     reason: str
     duration_ms: float
     
+    def _to_record(self) -> Dict[str, Any]:
+        """
+        Build the flat dict written to the JSONL log.
+        
+        All fields are flat, so a literal avoids asdict()'s recursive copy.
+        """
+        return {
+            'event_id': self.event_id,
+            'timestamp_iso': _format_timestamp_ns(self.timestamp_ns),
+            'agent_speaking': self.agent_speaking,
+            'transcript': self.transcript,
+            'tokens': self.tokens,
+            'confidence': self.confidence,
+            'action': self.action,
+            'reason': self.reason,
+            'duration_ms': self.duration_ms
+        }
+    
     def to_jsonl(self) -> str:
         """Convert to JSONL format for logging"""
-        data = asdict(self)
-        data['timestamp_iso'] = self.timestamp.isoformat()
-        del data['timestamp']
-        return json.dumps(data)
+        return self.to_jsonl_bytes().decode('utf-8')
+    
+    def to_jsonl_bytes(self) -> bytes:
+        """
+        Convert to UTF-8 encoded JSONL, using orjson when installed.
+        
+        The json fallback emits the same compact, non-ASCII-escaped output
+        as orjson, so log lines do not depend on which one is installed.
+        """
+        if orjson is not None:
+            return orjson.dumps(self._to_record())
+        return json.dumps(
+            self._to_record(), separators=(',', ':'), ensure_ascii=False
+        ).encode('utf-8')
+    
+    def _jsonl_line(self) -> bytes:
+        """Encoded JSONL record including its trailing newline"""
+        if orjson is not None:
+            return orjson.dumps(
+                self._to_record(), option=orjson.OPT_APPEND_NEWLINE
+            )
+        return self.to_jsonl_bytes() + b'\n'
 
 
 class InterruptHandler:
@@ -62,7 +202,17 @@ class InterruptHandler:
     filler words while preserving genuine user interruptions.
     """
     
-    def __init__(self, agent: any, config: Dict[str, any]):
+    # Distinct transcripts whose classification is memoized
+    CLASSIFY_CACHE_SIZE = 2048
+    
+    # Maximum number of JSONL lines written per background flush
+    LOG_BATCH_SIZE = 256
+    
+    # Write buffer size of the persistent log file handle; batches collect
+    # here and reach the OS once the buffer fills or the queue drains
+    LOG_BUFFER_BYTES = 1 << 20
+    
+    def __init__(self, agent: Any, config: Dict[str, Any]):
         """
         Initialize the interrupt handler.
         
@@ -75,39 +225,93 @@ class InterruptHandler:
                 - low_confidence_time_ms: Max duration for low-confidence ignore
                 - log_file: Path to JSONL log file
                 - enable_logging: Whether to log events
+                - log_ignored: Whether 'ignore' decisions are logged too
+                  (default False: only interrupts and registrations)
+                - log_tokens_on_ignore: Whether logged 'ignore' decisions
+                  include their tokens (default False: empty list)
+                - batch_window_ms: Coalescing window for bursts of events
+                  (0 decides on every event individually)
         """
         self.agent = agent
         self.config = config
+        # The agent interface is fixed, so resolve its stop hook once
+        stop_speaking = getattr(agent, 'stop_speaking', None)
+        self._agent_stop: Optional[Callable] = (
+            stop_speaking if callable(stop_speaking) else None
+        )
         
-        # Thread-safe state management
-        self._lock = Lock()
+        # Agent state. The handler is driven from a single asyncio loop and
+        # coroutines only switch at awaits, so these need no lock
         self._agent_speaking = False
-        self._last_vad_update = datetime.now(timezone.utc)
+        self._last_vad_update_ns = time.time_ns()
         
-        # Normalized word sets for fast lookup
-        self._ignored_words: Set[str] = set(
-            self._normalize_word(w) for w in config.get('ignored_words', [])
+        # Normalized word sets for fast lookup. They are immutable and only
+        # ever replaced by a single attribute rebind, so readers need no lock
+        self._ignored_words: FrozenSet[str] = frozenset(
+            map(self._normalize_word, config.get('ignored_words', []))
         )
-        self._command_words: Set[str] = set(
-            self._normalize_word(w) for w in config.get('command_words', [])
+        self._command_words: FrozenSet[str] = frozenset(
+            map(self._normalize_word, config.get('command_words', []))
         )
+        self._phrase_matcher = self._compile_phrase_matcher(self._command_words)
         
         # Configuration parameters
-        self.confidence_threshold = config.get('confidence_threshold', 0.3)
-        self.low_confidence_time_ms = config.get('low_confidence_time_ms', 500)
+        self.confidence_threshold = float(config.get('confidence_threshold', 0.3))
+        self.low_confidence_time_ms = int(config.get('low_confidence_time_ms', 500))
+        self.batch_window_ms = int(config.get('batch_window_ms', 0))
+        
+        # Events waiting for the coalescing window to close
+        self._pending_events: List[TranscriptionEvent] = []
+        self._pending_task: Optional[asyncio.Task] = None
+        
+        # Event ids are '<pid>-<counter>' in hex, so records from several
+        # processes sharing a log stay distinct
+        self._event_id_prefix = f"{os.getpid():x}-"
+        
+        # Memoized transcript classification; cleared when word lists change.
+        # Decisions are not cached: they also depend on confidence and the
+        # agent state, and _decide is a handful of comparisons
+        self._classify = lru_cache(maxsize=self.CLASSIFY_CACHE_SIZE)(
+            self._classify_transcript
+        )
         
         # Logging setup
         self.enable_logging = config.get('enable_logging', True)
+        self.log_ignored = bool(config.get('log_ignored', False))
+        self.log_tokens_on_ignore = bool(
+            config.get('log_tokens_on_ignore', False)
+        )
         self.log_file = Path(config.get('log_file', 'logs/interrupts.jsonl'))
         if self.enable_logging:
             self.log_file.parent.mkdir(parents=True, exist_ok=True)
         
+        # Pending decisions, serialized and written in batches by a
+        # background task (decisions are frozen, so this is safe)
+        self._log_buffer: Deque[InterruptDecision] = deque()
+        self._log_task: Optional[asyncio.Task] = None
+        # Opened on first write, closed by shutdown()
+        self._log_fp: Optional[BinaryIO] = None
+        
         # Callbacks for external notification
         self._interrupt_callback: Optional[Callable] = None
         
         # Internal logger
         self.logger = logging.getLogger(__name__)
         
+        # Stats returned by get_stats(); entries that only change with the
+        # word lists are kept current by the update methods
+        self._stats: Dict[str, Any] = {
+            'agent_speaking': self._agent_speaking,
+            'ignored_words_count': len(self._ignored_words),
+            'command_words_count': len(self._command_words),
+            'confidence_threshold': self.confidence_threshold,
+            'last_vad_update': _format_timestamp_ns(self._last_vad_update_ns),
+            'logging_enabled': self.enable_logging,
+            'log_file': str(self.log_file)
+        }
+        # VAD timestamp the cached 'last_vad_update' string was formatted from
+        self._stats_vad_ns = self._last_vad_update_ns
+        
         self.logger.info(
             f"InterruptHandler initialized with "
             f"{len(self._ignored_words)} ignored words, "
@@ -116,226 +320,455 @@ class InterruptHandler:
         )
     
     @staticmethod
-    def _normalize_word(word: str) -> str:
-        """Normalize word: lowercase, strip punctuation"""
-        return re.sub(r'[^\w\s]', '', word.lower()).strip()
+    def _strip_punctuation(word: str) -> str:
+        """
+        Strip punctuation from already-lowercased text.
+        
+        Surrounding whitespace is kept; callers split or strip as needed.
+        """
+        stripped = word.translate(_PUNCT_TABLE)
+        if not stripped.isascii():
+            # Other Unicode punctuation (e.g. '¿', '«') needs the regex
+            stripped = _PUNCT_RE.sub('', stripped)
+        return stripped
     
-    def _tokenize(self, transcript: str) -> List[str]:
-        """Split transcript into normalized tokens"""
-        return [
-            self._normalize_word(w) 
-            for w in transcript.split() 
-            if self._normalize_word(w)
-        ]
+    @staticmethod
+    def _normalize_word(word: str) -> str:
+        """
+        Normalize word: lowercase, strip punctuation.
+        
+        The result is interned. Word lists are bounded, so the intern table
+        stays small; transcript tokens are not interned, since their
+        vocabulary is unbounded and interned strings are immortal on
+        Python 3.12.
+        """
+        return sys.intern(
+            InterruptHandler._strip_punctuation(word.lower()).strip()
+        )
     
-    def _contains_command_word(self, tokens: List[str]) -> bool:
-        """Check if any token is a command word"""
-        return any(token in self._command_words for token in tokens)
+    @staticmethod
+    def _compile_phrase_matcher(
+        words: FrozenSet[str]
+    ) -> Optional[Callable[[str], Any]]:
+        """
+        Build a matcher for multi-word commands ('hang on', 'excuse me'),
+        run over the space-joined tokens.
+        
+        Uses a pyahocorasick automaton when installed, so the scan stays a
+        single C-level pass however many phrases are configured; otherwise
+        falls back to one alternation regex. Single-word commands are
+        matched by set lookup instead.
+        
+        Returns:
+            Callable returning a truthy value on a whole-word phrase match,
+            or None if there are no phrases
+        """
+        phrases = [w for w in words if ' ' in w]
+        if not phrases:
+            return None
+        
+        if ahocorasick is None:
+            alternation = '|'.join(
+                re.escape(p) for p in sorted(phrases, key=len, reverse=True)
+            )
+            return re.compile(r'\b(?:' + alternation + r')\b').search
+        
+        automaton = ahocorasick.Automaton()
+        for phrase in phrases:
+            automaton.add_word(phrase, len(phrase))
+        automaton.make_automaton()
+        
+        def match(text: str) -> bool:
+            last = len(text) - 1
+            for end, length in automaton.iter(text):
+                start = end - length + 1
+                # Tokens are joined by single spaces, so a whole-word match
+                # is bounded by a space or the end of the text
+                if ((start == 0 or text[start - 1] == ' ') and
+                        (end == last or text[end + 1] == ' ')):
+                    return True
+            return False
+        
+        return match
     
-    def _is_filler_only(self, tokens: List[str]) -> bool:
-        """Check if all tokens are filler words"""
+    def _classify_transcript(self, transcript: str) -> Tuple[Tuple[str, ...], int]:
+        """
+        Tokenize a lowercased transcript and classify its tokens.
+        
+        Punctuation is stripped from the whole transcript in one call, then
+        classification walks the tokens once, stopping at the first command
+        word. The result depends only on the transcript and the word lists,
+        so it is memoized through self._classify.
+        
+        Returns:
+            Tuple of (tokens, token class)
+        """
+        # Stripping never adds whitespace, so words that were pure
+        # punctuation simply disappear from the split
+        tokens = tuple(self._strip_punctuation(transcript).split())
         if not tokens:
-            return True
-        return all(token in self._ignored_words for token in tokens)
+            return tokens, _EMPTY
+        
+        command_words = self._command_words
+        ignored_words = self._ignored_words
+        filler_only = True
+        for token in tokens:
+            if token in command_words:
+                return tokens, _COMMAND
+            if filler_only and token not in ignored_words:
+                filler_only = False
+        
+        phrase_matcher = self._phrase_matcher
+        if phrase_matcher is not None and phrase_matcher(' '.join(tokens)):
+            return tokens, _COMMAND
+        if filler_only:
+            return tokens, _FILLER_ONLY
+        return tokens, _SPEECH
     
-    async def on_transcription_event(self, event: TranscriptionEvent) -> bool:
+    async def on_transcription_event(self, event: _EventInput) -> bool:
         """
         Process a transcription event and decide whether to interrupt.
         
+        When batch_window_ms is set, events arriving within the window are
+        merged and share a single decision.
+        
         Args:
-            event: TranscriptionEvent containing transcript and metadata
+            event: TranscriptionEvent containing transcript and metadata, or
+                a (transcript, confidence[, is_final]) tuple. A tuple avoids
+                building an event unless the interrupt callback needs one
             
         Returns:
             bool: True if agent should be interrupted, False otherwise
         """
-        start_time = datetime.now(timezone.utc)
-        event_id = str(uuid.uuid4())[:8]
+        if self.batch_window_ms > 0:
+            return await self._coalesce_events((event,))
+        return await self._handle_event(event)
+    
+    async def _coalesce_events(self, events: Iterable[_EventInput]) -> bool:
+        """Queue events for the current window and await its decision"""
+        # Merging reads is_final and timestamp, which tuples and duck-typed
+        # events may not carry
+        self._pending_events.extend(map(_as_transcription_event, events))
+        if self._pending_task is None:
+            self._pending_task = asyncio.ensure_future(
+                self._flush_pending_after(self.batch_window_ms / 1000)
+            )
+        # Shielded so one cancelled caller does not cancel the whole window
+        return await asyncio.shield(self._pending_task)
+    
+    async def _flush_pending_after(self, delay: float) -> bool:
+        """Close the coalescing window and decide on the merged events"""
+        await asyncio.sleep(delay)
+        events = self._pending_events
+        self._pending_events = []
+        self._pending_task = None
+        
+        # Empty partials and sub-threshold noise are dropped rather than
+        # averaged in, so they can neither mask a confident command nor lift
+        # noise over the threshold. If nothing is left, every event would
+        # have been ignored on its own and the whole window is ignored
+        threshold = self.confidence_threshold
+        usable = [
+            e for e in events
+            if e.confidence >= threshold and e.transcript.strip()
+        ] or events
+        
+        if len(usable) == 1:
+            return await self._handle_event(usable[0])
+        
+        merged = TranscriptionEvent(
+            transcript=' '.join(e.transcript for e in usable),
+            confidence=min(e.confidence for e in usable),
+            is_final=events[-1].is_final,
+            timestamp=events[0].timestamp
+        )
+        return await self._handle_event(merged)
+    
+    async def _handle_event(self, event: _EventInput) -> bool:
+        """Decide on a single event and act on it"""
+        agent_speaking = self._agent_speaking
+        
+        event_id, action, reason = self._evaluate_event(event, agent_speaking)
+        
+        # Execute action
+        should_interrupt = action == 'interrupt'
+        
+        if should_interrupt and agent_speaking:
+            await self._interrupt_agent(event, event_id, reason)
+        else:
+            self._log_passive_decision(event, event_id, action, reason)
+        
+        return should_interrupt
+    
+    async def on_transcription_events(
+        self, events: List[_EventInput], stop_on_interrupt: bool = False
+    ) -> List[bool]:
+        """
+        Process a burst of transcription events in a single call.
+        
+        Decisions are made synchronously in order; the handler only yields
+        to the event loop when an event actually interrupts the agent.
+        
+        When batch_window_ms is set, the events join the current coalescing
+        window instead, and every event gets the window's merged decision.
+        
+        Args:
+            events: TranscriptionEvents (or tuples, as accepted by
+                on_transcription_event) in arrival order
+            stop_on_interrupt: Return as soon as one event interrupts the
+                agent; later events are neither evaluated nor logged. Has
+                no effect when events are coalesced
+            
+        Returns:
+            List[bool]: Per-event interrupt flags, as returned by
+            on_transcription_event. With stop_on_interrupt, the list ends
+            at the interrupting event
+        """
+        if self.batch_window_ms > 0 and events:
+            return [await self._coalesce_events(events)] * len(events)
+        
+        agent_speaking = self._agent_speaking
+        
+        # Per-batch lookups, hoisted out of the loop
+        evaluate = self._evaluate_event
+        debug = self.logger.isEnabledFor(logging.DEBUG)
         
-        # Get current agent state (thread-safe)
-        with self._lock:
-            agent_speaking = self._agent_speaking
+        results: List[bool] = []
+        append = results.append
+        for event in events:
+            event_id, action, reason = evaluate(event, agent_speaking)
+            should_interrupt = action == 'interrupt'
+            
+            if should_interrupt and agent_speaking:
+                await self._interrupt_agent(event, event_id, reason)
+                if stop_on_interrupt:
+                    append(True)
+                    break
+                # State may have changed while we were suspended
+                agent_speaking = self._agent_speaking
+            elif debug:
+                self._log_passive_decision(event, event_id, action, reason)
+            
+            append(should_interrupt)
+        
+        return results
+    
+    def classify_batch(
+        self,
+        items: Iterable[Tuple[str, float]],
+        agent_speaking: bool = True
+    ) -> List[Tuple[str, str]]:
+        """
+        Replay recorded transcripts through the decision logic offline.
         
-        # Tokenize and analyze transcript
-        tokens = self._tokenize(event.transcript)
+        Intended for bulk analysis of conversation logs: no events are
+        built, nothing is logged and the agent is never called. Repeated
+        transcripts are served from a cache private to this call, so a
+        large replay does not evict the live path's cached transcripts.
         
-        # Decision logic
-        decision = self._make_decision(
-            event_id=event_id,
-            timestamp=start_time,
-            agent_speaking=agent_speaking,
-            transcript=event.transcript,
-            tokens=tokens,
-            confidence=event.confidence
+        Args:
+            items: (transcript, confidence) pairs
+            agent_speaking: Agent state to assume for every item
+            
+        Returns:
+            List of (action, reason) tuples, one per item
+        """
+        classify = lru_cache(maxsize=self.CLASSIFY_CACHE_SIZE)(
+            self._classify_transcript
         )
+        decide = self._decide
+        return [
+            decide(agent_speaking, confidence, classify(transcript.lower())[1])
+            for transcript, confidence in items
+        ]
+    
+    def _evaluate_event(
+        self, event: _EventInput, agent_speaking: bool
+    ) -> Tuple[str, str, str]:
+        """
+        Decide on a single event and queue it for logging.
         
-        # Calculate processing time
-        duration_ms = (datetime.now(timezone.utc) - start_time).total_seconds() * 1000
-        decision.duration_ms = duration_ms
+        The InterruptDecision record is only built when logging is enabled.
         
-        # Log the decision
-        if self.enable_logging:
-            await self._log_decision(decision)
+        Returns:
+            Tuple of (event_id, action, reason)
+        """
+        event_id = f"{self._event_id_prefix}{next(_EVENT_COUNTER):08x}"
+        
+        enable_logging = self.enable_logging
+        if enable_logging:
+            t0 = time.perf_counter_ns()
+            start_ns = time.time_ns()
+        
+        if isinstance(event, tuple):
+            transcript, confidence = event[0], event[1]
+            lower = transcript.lower()
+        elif isinstance(event, TranscriptionEvent):
+            # Lowercased once by the event itself
+            transcript, confidence = event.transcript, event.confidence
+            lower = event._lower
+        else:
+            # Duck-typed events (e.g. raw LiveKit events) have no cached copy
+            transcript, confidence = event.transcript, event.confidence
+            lower = transcript.lower()
+        
+        # Tokenize and analyze transcript. Silence and noise frames skip
+        # normalization and the cache lookup
+        if lower and not lower.isspace():
+            tokens, token_class = self._classify(lower)
+        else:
+            tokens, token_class = (), _EMPTY
+        action, reason = self._decide(agent_speaking, confidence, token_class)
         
-        # Execute action
-        should_interrupt = decision.action == 'interrupt'
+        if not enable_logging or (action == 'ignore' and not self.log_ignored):
+            return event_id, action, reason
         
-        if should_interrupt and agent_speaking:
-            self.logger.info(
-                f"[{event_id}] INTERRUPT: '{event.transcript}' - {decision.reason}"
+        # Tokens of ignored events repeat the transcript; omit by default
+        if action == 'ignore' and not self.log_tokens_on_ignore:
+            tokens = ()
+        
+        # Calculate processing time (monotonic clock, no datetime math)
+        duration_ms = (time.perf_counter_ns() - t0) / 1e6
+        
+        # Positional, in field order: this runs for every logged event
+        self._log_decision(InterruptDecision(
+            event_id, start_ns, agent_speaking, transcript,
+            tokens, confidence, action, reason, duration_ms
+        ))
+        
+        return event_id, action, reason
+    
+    async def _interrupt_agent(
+        self, event: _EventInput, event_id: str, reason: str
+    ):
+        """Stop the agent and notify the interrupt callback"""
+        if isinstance(event, tuple):
+            # Callbacks always receive a TranscriptionEvent
+            event = TranscriptionEvent(*event)
+        self.logger.info(
+            f"[{event_id}] INTERRUPT: '{event.transcript}' - {reason}"
+        )
+        # Notify agent to stop
+        if self._agent_stop is not None:
+            await self._agent_stop()
+        # Call external callback if set
+        if self._interrupt_callback:
+            await self._interrupt_callback(event)
+    
+    def _log_passive_decision(
+        self, event: _EventInput, event_id: str, action: str, reason: str
+    ):
+        """Debug-log a decision that did not interrupt the agent"""
+        if self.logger.isEnabledFor(logging.DEBUG):
+            transcript = (
+                event[0] if isinstance(event, tuple) else event.transcript
             )
-            # Notify agent to stop
-            if hasattr(self.agent, 'stop_speaking'):
-                await self.agent.stop_speaking()
-            # Call external callback if set
-            if self._interrupt_callback:
-                await self._interrupt_callback(event)
-        else:
             self.logger.debug(
-                f"[{event_id}] {decision.action.upper()}: "
-                f"'{event.transcript}' - {decision.reason}"
+                f"[{event_id}] {action.upper()}: '{transcript}' - {reason}"
             )
-        
-        return should_interrupt
     
-    def _make_decision(
+    def _decide(
         self,
-        event_id: str,
-        timestamp: datetime,
         agent_speaking: bool,
-        transcript: str,
-        tokens: List[str],
-        confidence: float
-    ) -> InterruptDecision:
+        confidence: float,
+        token_class: int
+    ) -> Tuple[str, str]:
         """
         Core decision logic for interrupt handling.
         
-        Returns an InterruptDecision with action and reasoning.
+        Returns:
+            Tuple of (action, reason)
         """
         # Empty transcript - ignore
-        if not tokens:
-            return InterruptDecision(
-                event_id=event_id,
-                timestamp=timestamp,
-                agent_speaking=agent_speaking,
-                transcript=transcript,
-                tokens=tokens,
-                confidence=confidence,
-                action='ignore',
-                reason='Empty transcript',
-                duration_ms=0.0
-            )
+        if token_class == _EMPTY:
+            return 'ignore', 'Empty transcript'
         
         # Low confidence - ignore
         if confidence < self.confidence_threshold:
-            return InterruptDecision(
-                event_id=event_id,
-                timestamp=timestamp,
-                agent_speaking=agent_speaking,
-                transcript=transcript,
-                tokens=tokens,
-                confidence=confidence,
-                action='ignore',
-                reason=f'Low confidence ({confidence:.2f} < {self.confidence_threshold})',
-                duration_ms=0.0
+            return (
+                'ignore',
+                f'Low confidence ({confidence:.2f} < {self.confidence_threshold})'
             )
         
         # Agent is NOT speaking - register all speech
         if not agent_speaking:
-            return InterruptDecision(
-                event_id=event_id,
-                timestamp=timestamp,
-                agent_speaking=agent_speaking,
-                transcript=transcript,
-                tokens=tokens,
-                confidence=confidence,
-                action='register',
-                reason='Agent not speaking, registering user speech',
-                duration_ms=0.0
-            )
+            return 'register', 'Agent not speaking, registering user speech'
         
         # Agent IS speaking - apply filtering logic
         
         # Contains command word - always interrupt
-        if self._contains_command_word(tokens):
-            return InterruptDecision(
-                event_id=event_id,
-                timestamp=timestamp,
-                agent_speaking=agent_speaking,
-                transcript=transcript,
-                tokens=tokens,
-                confidence=confidence,
-                action='interrupt',
-                reason='Contains command word',
-                duration_ms=0.0
-            )
+        if token_class == _COMMAND:
+            return 'interrupt', 'Contains command word'
         
         # Only fillers - ignore
-        if self._is_filler_only(tokens):
-            return InterruptDecision(
-                event_id=event_id,
-                timestamp=timestamp,
-                agent_speaking=agent_speaking,
-                transcript=transcript,
-                tokens=tokens,
-                confidence=confidence,
-                action='ignore',
-                reason='Filler-only speech while agent speaking',
-                duration_ms=0.0
-            )
+        if token_class == _FILLER_ONLY:
+            return 'ignore', 'Filler-only speech while agent speaking'
         
         # Contains real words (not fillers, not commands) - interrupt
-        return InterruptDecision(
-            event_id=event_id,
-            timestamp=timestamp,
-            agent_speaking=agent_speaking,
-            transcript=transcript,
-            tokens=tokens,
-            confidence=confidence,
-            action='interrupt',
-            reason='Real user speech detected',
-            duration_ms=0.0
-        )
+        return 'interrupt', 'Real user speech detected'
     
     async def on_vad_state_change(self, is_speaking: bool):
         """
         Update internal state when agent's speaking state changes.
         
+        Coroutine form for async VAD hooks; see set_agent_speaking.
+        
+        Args:
+            is_speaking: True if agent is currently speaking, False otherwise
+        """
+        self.set_agent_speaking(is_speaking)
+    
+    def set_agent_speaking(self, is_speaking: bool):
+        """
+        Synchronous form of on_vad_state_change, for VAD callbacks that
+        are not coroutines. Avoids creating a coroutine per state change.
+        
         Args:
             is_speaking: True if agent is currently speaking, False otherwise
         """
-        with self._lock:
-            old_state = self._agent_speaking
-            self._agent_speaking = is_speaking
-            self._last_vad_update = datetime.now(timezone.utc)
+        # The two-field transition contains no await, so no other coroutine
+        # on the loop can observe it half-done; no lock is needed
+        old_state = self._agent_speaking
+        self._agent_speaking = is_speaking
+        self._last_vad_update_ns = time.time_ns()
         
-        if old_state != is_speaking:
+        if old_state != is_speaking and self.logger.isEnabledFor(logging.DEBUG):
             self.logger.debug(
                 f"Agent state changed: {'speaking' if is_speaking else 'quiet'}"
             )
     
-    def update_ignored_words(self, words: List[str]):
+    def update_ignored_words(self, words: Iterable[str]):
         """
         Dynamically update the list of ignored filler words.
         
         Args:
-            words: New list of words to ignore
+            words: New words to ignore (list, set or any iterable); stored
+                normalized in a frozenset
         """
-        with self._lock:
-            self._ignored_words = set(self._normalize_word(w) for w in words)
+        # Single rebind of an immutable set is atomic; no lock needed
+        self._ignored_words = frozenset(map(self._normalize_word, words))
+        self._classify.cache_clear()
+        self._stats['ignored_words_count'] = len(self._ignored_words)
         
         self.logger.info(
             f"Updated ignored words list: {len(self._ignored_words)} words"
         )
     
-    def update_command_words(self, words: List[str]):
+    def update_command_words(self, words: Iterable[str]):
         """
         Dynamically update the list of command words.
         
         Args:
-            words: New list of command words
+            words: New command words (list, set or any iterable); stored
+                normalized in a frozenset
         """
-        with self._lock:
-            self._command_words = set(self._normalize_word(w) for w in words)
+        command_words = frozenset(map(self._normalize_word, words))
+        # Publish the phrase matcher first: a reader that still sees the old
+        # word set at worst matches with the new phrases for one event
+        self._phrase_matcher = self._compile_phrase_matcher(command_words)
+        self._command_words = command_words
+        self._classify.cache_clear()
+        self._stats['command_words_count'] = len(command_words)
         
         self.logger.info(
             f"Updated command words list: {len(self._command_words)} words"
@@ -350,32 +783,99 @@ class InterruptHandler:
         """
         self._interrupt_callback = callback
     
-    async def _log_decision(self, decision: InterruptDecision):
-        """Write decision to JSONL log file"""
-        try:
-            async with asyncio.Lock():  # Prevent concurrent writes
-                with open(self.log_file, 'a') as f:
-                    f.write(decision.to_jsonl() + '\n')
-        except Exception as e:
-            self.logger.error(f"Failed to log decision: {e}")
+    def _log_decision(self, decision: InterruptDecision):
+        """Queue decision for the background JSONL writer"""
+        self._log_buffer.append(decision)
+        
+        # Single writer task; restarted whenever the previous one drained
+        if self._log_task is None or self._log_task.done():
+            self._log_task = asyncio.create_task(self._drain_log_buffer())
+    
+    async def _drain_log_buffer(self):
+        """
+        Write buffered decisions in batches until the buffer is empty, then
+        flush the file once.
+        
+        _log_decision never starts a second drain while one is running, so
+        this task is the only writer and the log file needs no lock. I/O
+        errors are reported here rather than on the decision path.
+        """
+        loop = asyncio.get_running_loop()
+        buffer = self._log_buffer
+        
+        # Lines queued during the final flush are picked up by another pass
+        while buffer:
+            while buffer:
+                batch = [
+                    buffer.popleft()
+                    for _ in range(min(len(buffer), self.LOG_BATCH_SIZE))
+                ]
+                try:
+                    await loop.run_in_executor(None, self._write_lines, batch)
+                except Exception as e:
+                    self.logger.error(f"Failed to log decision: {e}")
+            
+            if self._log_fp is not None:
+                try:
+                    await loop.run_in_executor(None, self._log_fp.flush)
+                except Exception as e:
+                    self.logger.error(f"Failed to flush log file: {e}")
     
-    def get_stats(self) -> Dict[str, any]:
+    def _write_lines(self, decisions: List[InterruptDecision]):
+        """
+        Serialize a batch of decisions and append it to the buffered log
+        file. Runs in the executor, off the decision path.
+        """
+        if self._log_fp is None:
+            self._log_fp = open(
+                self.log_file, 'ab', buffering=self.LOG_BUFFER_BYTES
+            )
+        # Lines carry their own newline, so they go straight to the buffer
+        self._log_fp.writelines(
+            [decision._jsonl_line() for decision in decisions]
+        )
+    
+    def _close_log_file(self):
+        """Close the persistent log file handle, if open"""
+        if self._log_fp is not None:
+            self._log_fp.close()
+            self._log_fp = None
+    
+    async def flush_logs(self):
+        """
+        Wait until all queued log records have been written.
+        
+        Events still waiting in a coalescing window are decided first, so
+        their records are included. Cancelling the caller does not cancel
+        the background work it waits on.
+        """
+        if self._pending_task is not None:
+            await asyncio.shield(self._pending_task)
+        if self._log_task is not None:
+            await asyncio.shield(self._log_task)
+    
+    def get_stats(self) -> Dict[str, Any]:
         """
         Get current statistics about the handler.
         
+        Only the fields that can change between calls are refreshed, and
+        the VAD timestamp is only reformatted after a state change; the
+        rest are maintained when the word lists are updated.
+        
         Returns:
-            Dict with configuration and state information
-        """
-        with self._lock:
-            return {
-                'agent_speaking': self._agent_speaking,
-                'ignored_words_count': len(self._ignored_words),
-                'command_words_count': len(self._command_words),
-                'confidence_threshold': self.confidence_threshold,
-                'last_vad_update': self._last_vad_update.isoformat(),
-                'logging_enabled': self.enable_logging,
-                'log_file': str(self.log_file)
-            }
+            Dict with configuration and state information (a copy, safe
+            for the caller to modify)
+        """
+        stats = self._stats
+        stats['agent_speaking'] = self._agent_speaking
+        vad_ns = self._last_vad_update_ns
+        if vad_ns != self._stats_vad_ns:
+            self._stats_vad_ns = vad_ns
+            stats['last_vad_update'] = _format_timestamp_ns(vad_ns)
+        # Public attributes, which callers may reassign
+        stats['confidence_threshold'] = self.confidence_threshold
+        stats['logging_enabled'] = self.enable_logging
+        return stats.copy()
     
     async def shutdown(self):
         """
@@ -385,8 +885,10 @@ class InterruptHandler:
         """
         self.logger.info("Shutting down InterruptHandler")
         
-        # Wait for any pending async operations
-        await asyncio.sleep(0.1)
+        # Decide on events still waiting for their coalescing window and
+        # write out any pending log records, then release the file
+        await self.flush_logs()
+        self._close_log_file()
         
         self.logger.info("InterruptHandler shutdown complete")
 
@@ -399,7 +901,7 @@ class LiveKitAgentAdapter:
     This shows how to hook the handler into LiveKit's event system.
     """
     
-    def __init__(self, livekit_agent, handler_config: Dict[str, any]):
+    def __init__(self, livekit_agent, handler_config: Dict[str, Any]):
         """
         Initialize adapter with LiveKit agent and handler config.
         
@@ -418,31 +920,36 @@ class LiveKitAgentAdapter:
         Set up event hooks without modifying LiveKit core.
         
         This method demonstrates how to intercept events using callbacks.
+        The handler's entry points are bound once here rather than looked
+        up on every event.
         """
+        on_transcription_event = self.handler.on_transcription_event
+        set_agent_speaking = self.handler.set_agent_speaking
+        
         # Example: Hook into transcription events
         if hasattr(self.agent, 'on_transcription'):
             original_handler = self.agent.on_transcription
             
-            async def wrapped_handler(event):
+            async def wrapped_transcription(event):
                 # Let our handler process first
-                should_interrupt = await self.handler.on_transcription_event(event)
+                should_interrupt = await on_transcription_event(event)
                 
                 # Only call original if not interrupting
                 if not should_interrupt and original_handler:
                     await original_handler(event)
             
-            self.agent.on_transcription = wrapped_handler
+            self.agent.on_transcription = wrapped_transcription
         
         # Example: Hook into VAD state changes
         if hasattr(self.agent, 'on_speaking_state_changed'):
             original_handler = self.agent.on_speaking_state_changed
             
-            async def wrapped_handler(is_speaking):
-                await self.handler.on_vad_state_change(is_speaking)
+            async def wrapped_speaking_state(is_speaking):
+                set_agent_speaking(is_speaking)
                 if original_handler:
                     await original_handler(is_speaking)
             
-            self.agent.on_speaking_state_changed = wrapped_handler
+            self.agent.on_speaking_state_changed = wrapped_speaking_state
     
     async def shutdown(self):
         """Shutdown the adapter and handler"""
@@ -40,7 +40,7 @@ echo "   ✅ Virtual environment activated"
 echo ""
 echo "📦 Installing dependencies..."
 pip install -q --upgrade pip
-pip install -q pytest pytest-asyncio
+pip install -q pytest pytest-asyncio numpy
 echo "   ✅ Dependencies installed"
 
 # Create directories
@@ -5,11 +5,13 @@ Tests all scenarios from the assignment specification.
 """
 
 import pytest
+import pytest_asyncio
 import asyncio
 import tempfile
 import json
 from pathlib import Path
 from datetime import datetime, timezone
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock
 
 import sys
@@ -59,14 +61,17 @@ def basic_config(temp_log_file):
         'confidence_threshold': 0.3,
         'low_confidence_time_ms': 500,
         'log_file': str(temp_log_file),
-        'enable_logging': True
+        'enable_logging': True,
+        'log_ignored': True
     }
 
 
-@pytest.fixture
-def handler(mock_agent, basic_config):
-    """Create handler instance"""
-    return InterruptHandler(mock_agent, basic_config)
+@pytest_asyncio.fixture
+async def handler(mock_agent, basic_config):
+    """Create handler instance, shut down after the test"""
+    handler = InterruptHandler(mock_agent, basic_config)
+    yield handler
+    await handler.shutdown()
 
 
 # ============================================================================
@@ -283,7 +288,11 @@ async def test_punctuation_and_case_handling(handler):
         'Umm.',
         'HMM!',
         'uh...',
-        'UMM???'
+        'UMM???',
+        'umm\x1b',
+        '\x00uh\x7f',
+        'uh\u2026',
+        '\u201cumm\u201d \u2014 hmm'
     ]
     
     for variant in filler_variants:
@@ -319,6 +328,22 @@ async def test_punctuation_and_case_handling(handler):
             f"Should recognize '{variant}' as command"
 
 
+@pytest.mark.asyncio
+async def test_case_handling_for_duck_typed_events(handler):
+    """
+    Scenario: Raw events that only carry transcript and confidence
+    Expected: Lowercased and recognized like TranscriptionEvents
+    """
+    await handler.on_vad_state_change(is_speaking=True)
+    
+    assert await handler.on_transcription_event(
+        SimpleNamespace(transcript='WAIT', confidence=0.9)
+    ) is True
+    assert await handler.on_transcription_event(
+        SimpleNamespace(transcript='Umm.', confidence=0.9)
+    ) is False
+
+
 # ============================================================================
 # Test 8: Dynamic Word List Updates
 # ============================================================================
@@ -413,8 +438,8 @@ async def test_jsonl_logging_format(handler, temp_log_file):
         )
         await handler.on_transcription_event(event)
     
-    # Small delay to ensure writes complete
-    await asyncio.sleep(0.2)
+    # Wait until the background writer has flushed every record
+    await handler.flush_logs()
     
     # Read and validate log entries
     assert temp_log_file.exists(), "Log file should exist"
@@ -448,6 +473,29 @@ async def test_jsonl_logging_format(handler, temp_log_file):
         assert data['action'] in ['interrupt', 'ignore', 'register']
 
 
+@pytest.mark.asyncio
+async def test_event_ids_unique_across_handlers(mock_agent, basic_config,
+                                                temp_log_file):
+    """
+    Scenario: Two handlers in one process write to the same log
+    Expected: Every record has a distinct event_id
+    """
+    handlers = [InterruptHandler(mock_agent, basic_config) for _ in range(2)]
+    
+    for handler in handlers:
+        for transcript in ('uh', 'wait'):
+            await handler.on_transcription_event(
+                TranscriptionEvent(transcript=transcript, confidence=0.9)
+            )
+        await handler.shutdown()
+    
+    with open(temp_log_file, 'r') as f:
+        ids = [json.loads(line)['event_id'] for line in f]
+    
+    assert len(ids) == 4
+    assert len(set(ids)) == 4
+
+
 # ============================================================================
 # Test 11: Thread Safety
 # ============================================================================
@@ -501,6 +549,11 @@ def test_get_stats(handler):
     assert 'confidence_threshold' in stats
     assert stats['ignored_words_count'] == 4  # From basic_config
     assert stats['command_words_count'] == 4  # From basic_config
+    
+    # Returned dict is a snapshot; word list updates show up on the next call
+    stats['ignored_words_count'] = 0
+    handler.update_ignored_words(['uh', 'umm'])
+    assert handler.get_stats()['ignored_words_count'] == 2
 
 
 # ============================================================================
@@ -522,6 +575,358 @@ async def test_shutdown_graceful(handler):
     await handler.shutdown()
 
 
+# ============================================================================
+# Test 14: Batched Log Flushing
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_flush_logs_writes_all_batches(handler, temp_log_file):
+    """
+    Scenario: More events than fit in one background write batch
+    Expected: flush_logs() returns only after every record is on disk
+    """
+    await handler.on_vad_state_change(is_speaking=True)
+    
+    total = handler.LOG_BATCH_SIZE * 2 + 5
+    for i in range(total):
+        event = TranscriptionEvent(transcript=f'word{i}', confidence=0.8)
+        await handler.on_transcription_event(event)
+    
+    await handler.flush_logs()
+    
+    with open(temp_log_file, 'r') as f:
+        lines = f.readlines()
+    
+    assert len(lines) == total
+    assert json.loads(lines[-1])['transcript'] == f'word{total - 1}'
+
+
+# ============================================================================
+# Test 15: Multi-Word Command Phrases
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_multi_word_command_phrase(handler, temp_log_file):
+    """
+    Scenario: Command configured as a phrase ('hang on')
+    Expected: Phrase is matched across tokens, single words are not
+    """
+    handler.update_command_words(['wait', 'hang on'])
+    handler.update_ignored_words(['uh', 'hang', 'on'])
+    await handler.on_vad_state_change(is_speaking=True)
+    
+    phrase = TranscriptionEvent(transcript='uh, hang on!', confidence=0.8)
+    assert await handler.on_transcription_event(phrase) is True
+    
+    split = TranscriptionEvent(transcript='on uh hang', confidence=0.8)
+    assert await handler.on_transcription_event(split) is False
+    
+    # Phrase must match whole words, not a prefix of a longer word
+    handler.update_ignored_words(['uh', 'hang', 'online'])
+    partial = TranscriptionEvent(transcript='hang online', confidence=0.8)
+    assert await handler.on_transcription_event(partial) is False
+    
+    await handler.flush_logs()
+    with open(temp_log_file, 'r') as f:
+        reasons = [json.loads(line)['reason'] for line in f]
+    
+    assert reasons[0] == 'Contains command word'
+
+
+# ============================================================================
+# Test 16: Batched Event Processing
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_batch_matches_single_event_results(handler):
+    """
+    Scenario: A burst of events passed to on_transcription_events
+    Expected: Same per-event results as calling on_transcription_event
+    """
+    await handler.on_vad_state_change(is_speaking=True)
+    
+    transcripts = ['uh', 'wait', 'hmm umm', 'tell me more', '', 'stop!']
+    events = [
+        TranscriptionEvent(transcript=t, confidence=0.8) for t in transcripts
+    ]
+    
+    batch_results = await handler.on_transcription_events(events)
+    single_results = [
+        await handler.on_transcription_event(e) for e in events
+    ]
+    
+    assert batch_results == single_results
+    assert batch_results == [False, True, False, True, False, True]
+
+
+# ============================================================================
+# Test 17: Logging Disabled
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_logging_disabled_same_decisions(mock_agent, basic_config,
+                                               temp_log_file):
+    """
+    Scenario: Handler runs with enable_logging=False
+    Expected: Same decisions as with logging, nothing written to the log
+    """
+    config = dict(basic_config, enable_logging=False)
+    handler = InterruptHandler(mock_agent, config)
+    await handler.on_vad_state_change(is_speaking=True)
+    
+    cases = [('uh', 0.8, False), ('wait', 0.8, True), ('stop', 0.1, False),
+             ('tell me more', 0.8, True), ('', 0.8, False)]
+    
+    for transcript, confidence, expected in cases:
+        event = TranscriptionEvent(transcript=transcript, confidence=confidence)
+        assert await handler.on_transcription_event(event) is expected
+    
+    await handler.shutdown()
+    assert temp_log_file.stat().st_size == 0
+
+
+# ============================================================================
+# Test 18: Coalescing Window
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_batch_window_coalesces_burst(mock_agent, basic_config,
+                                            temp_log_file):
+    """
+    Scenario: Burst of events arrives within batch_window_ms
+    Expected: One merged decision shared by every event, one log line
+    """
+    config = dict(basic_config, batch_window_ms=20)
+    handler = InterruptHandler(mock_agent, config)
+    await handler.on_vad_state_change(is_speaking=True)
+    
+    burst = [TranscriptionEvent(transcript=t, confidence=0.8)
+             for t in ('uh', 'umm', 'wait')]
+    results = await asyncio.gather(
+        *(handler.on_transcription_event(e) for e in burst)
+    )
+    assert results == [True, True, True]
+    
+    await handler.shutdown()
+    with open(temp_log_file, 'r') as f:
+        lines = [json.loads(line) for line in f]
+    
+    assert len(lines) == 1
+    assert lines[0]['transcript'] == 'uh umm wait'
+    assert lines[0]['action'] == 'interrupt'
+
+
+@pytest.mark.asyncio
+async def test_batch_api_joins_coalescing_window(mock_agent, basic_config,
+                                                 temp_log_file):
+    """
+    Scenario: on_transcription_events called with batch_window_ms set,
+    alongside a duck-typed single event
+    Expected: Burst merges with the concurrent event into one decision
+    """
+    config = dict(basic_config, batch_window_ms=20)
+    handler = InterruptHandler(mock_agent, config)
+    await handler.on_vad_state_change(is_speaking=True)
+    
+    burst = [TranscriptionEvent(transcript=t, confidence=0.8)
+             for t in ('uh', 'umm')]
+    batch, single = await asyncio.gather(
+        handler.on_transcription_events(burst),
+        handler.on_transcription_event(
+            SimpleNamespace(transcript='stop', confidence=0.8)
+        ),
+    )
+    assert batch == [True, True]
+    assert single is True
+    assert await handler.on_transcription_events([]) == []
+    
+    await handler.shutdown()
+    with open(temp_log_file, 'r') as f:
+        lines = [json.loads(line) for line in f]
+    
+    assert len(lines) == 1
+    assert lines[0]['transcript'] == 'uh umm stop'
+
+
+@pytest.mark.asyncio
+async def test_batch_window_drops_empty_and_low_confidence(mock_agent,
+                                                           basic_config):
+    """
+    Scenario: Window mixes a command with an empty partial, or noise with
+    a confident filler
+    Expected: Same decisions as processing the events one at a time
+    """
+    config = dict(basic_config, batch_window_ms=20)
+    handler = InterruptHandler(mock_agent, config)
+    await handler.on_vad_state_change(is_speaking=True)
+    
+    def burst(*pairs):
+        return [TranscriptionEvent(transcript=t, confidence=c)
+                for t, c in pairs]
+    
+    assert await handler.on_transcription_events(
+        burst(('wait', 0.35), ('', 0.0))
+    ) == [True, True]
+    assert await handler.on_transcription_events(
+        burst(('stop', 0.4), ('uh', 0.1))
+    ) == [True, True]
+    assert await handler.on_transcription_events(
+        burst(('blah', 0.1), ('uh', 0.9))
+    ) == [False, False]
+    assert await handler.on_transcription_events(
+        burst(('blah', 0.1), ('  ', 0.9))
+    ) == [False, False]
+    
+    await handler.shutdown()
+
+
+# ============================================================================
+# Test 19: Offline Batch Classification
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_classify_batch_matches_live_decisions(handler, temp_log_file):
+    """
+    Scenario: Recorded transcripts replayed through classify_batch
+    Expected: Same actions as live events, nothing logged, agent untouched
+    """
+    items = [('uh', 0.8), ('Wait!', 0.8), ('stop', 0.1),
+             ('tell me more', 0.8), ('', 0.8)]
+    
+    replayed = handler.classify_batch(items, agent_speaking=True)
+    assert handler._classify.cache_info().currsize == 0
+    await handler.flush_logs()
+    assert temp_log_file.stat().st_size == 0
+    assert handler.agent.speaking_stopped_count == 0
+    
+    await handler.on_vad_state_change(is_speaking=True)
+    for (transcript, confidence), (action, _) in zip(items, replayed):
+        event = TranscriptionEvent(transcript=transcript, confidence=confidence)
+        assert await handler.on_transcription_event(event) is (
+            action == 'interrupt'
+        )
+    
+    assert [action for action, _ in replayed] == [
+        'ignore', 'interrupt', 'ignore', 'interrupt', 'ignore'
+    ]
+
+
+# ============================================================================
+# Test 20: Ignored Events Not Logged By Default
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_ignored_events_not_logged_by_default(mock_agent, basic_config,
+                                                    temp_log_file):
+    """
+    Scenario: Handler runs without log_ignored
+    Expected: Only interrupt and register decisions reach the log
+    """
+    config = dict(basic_config)
+    del config['log_ignored']
+    handler = InterruptHandler(mock_agent, config)
+    
+    await handler.on_transcription_event(
+        TranscriptionEvent(transcript='hello', confidence=0.8)
+    )
+    await handler.on_vad_state_change(is_speaking=True)
+    for transcript in ('uh', '', 'wait'):
+        await handler.on_transcription_event(
+            TranscriptionEvent(transcript=transcript, confidence=0.8)
+        )
+    
+    await handler.shutdown()
+    with open(temp_log_file, 'r') as f:
+        actions = [json.loads(line)['action'] for line in f]
+    
+    assert actions == ['register', 'interrupt']
+
+
+# ============================================================================
+# Test 21: Tuple Event Fast Path
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_tuple_events_match_dataclass_events(handler):
+    """
+    Scenario: Events passed as (transcript, confidence, is_final) tuples
+    Expected: Same decisions as TranscriptionEvent; callback gets an event
+    """
+    received = []
+    
+    async def on_interrupt(event):
+        received.append(event)
+    
+    handler.set_interrupt_callback(on_interrupt)
+    await handler.on_vad_state_change(is_speaking=True)
+    
+    assert await handler.on_transcription_event(('uh...', 0.8, True)) is False
+    assert await handler.on_transcription_event(('Wait!', 0.8, True)) is True
+    assert await handler.on_transcription_events(
+        [('umm', 0.8, True), ('stop', 0.1, True), ('go on', 0.9, False)]
+    ) == [False, False, True]
+    
+    assert [e.transcript for e in received] == ['Wait!', 'go on']
+    assert all(isinstance(e, TranscriptionEvent) for e in received)
+    assert received[1].is_final is False
+
+
+# ============================================================================
+# Test 22: Batch Early Termination
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_batch_stop_on_interrupt(handler, temp_log_file):
+    """
+    Scenario: Burst processed with stop_on_interrupt=True
+    Expected: Processing ends at the first interrupt; rest is not logged
+    """
+    await handler.on_vad_state_change(is_speaking=True)
+    
+    events = [TranscriptionEvent(transcript=t, confidence=0.8)
+              for t in ('uh', 'wait', 'tell me more')]
+    results = await handler.on_transcription_events(
+        events, stop_on_interrupt=True
+    )
+    assert results == [False, True]
+    
+    await handler.flush_logs()
+    with open(temp_log_file, 'r') as f:
+        transcripts = [json.loads(line)['transcript'] for line in f]
+    assert transcripts == ['uh', 'wait']
+
+
+# ============================================================================
+# Test 23: Tokens Omitted For Ignored Events
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_ignored_event_tokens(mock_agent, basic_config, temp_log_file):
+    """
+    Scenario: Ignored events logged with and without log_tokens_on_ignore
+    Expected: Tokens only kept for ignored events when the flag is set
+    """
+    for keep_tokens, expected in ((False, []), (True, ['uh', 'umm'])):
+        config = dict(basic_config, log_tokens_on_ignore=keep_tokens)
+        handler = InterruptHandler(mock_agent, config)
+        await handler.on_vad_state_change(is_speaking=True)
+        await handler.on_transcription_event(
+            TranscriptionEvent(transcript='uh umm', confidence=0.8)
+        )
+        await handler.on_transcription_event(
+            TranscriptionEvent(transcript='wait now', confidence=0.8)
+        )
+        await handler.shutdown()
+        
+        with open(temp_log_file, 'r') as f:
+            records = [json.loads(line) for line in f]
+        temp_log_file.write_text('')
+        
+        assert records[0]['action'] == 'ignore'
+        assert records[0]['tokens'] == expected
+        assert records[1]['tokens'] == ['wait', 'now']
+
+
 # ============================================================================
 # Run Tests
 # ============================================================================